@@ -1,7 +1,19 @@
-import pdfplumber
+import fitz   # PyMuPDF — parses pages an order of magnitude faster than pdfminer
+import numpy as np
 import os
 import csv
 import re
+import json
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Numba is optional: when present the column filter is LLVM-compiled
+# (and auto-vectorized); otherwise the NumPy mask below is used as-is
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # --------------------------------------------------
 # LABEL CONFIGURATION
@@ -20,7 +32,7 @@ LABELS = {
 }
 
 # * Used to prevent accidentally extracting one label as the value of another
-ALL_LABELS = {v.lower() for v in LABELS.values()} # Lowercase version of all labels
+ALL_LABELS = frozenset(v.lower() for v in LABELS.values()) # Lowercase version of all labels
 
 
 
@@ -30,6 +42,40 @@ COLUMN_TABLE_FIELDS = {
     "Total"
 }
 
+# * Compiled once at import so per-invoice calls skip re's cache lookup
+_PP_RE = re.compile(r"\bPP\d{6,}\b", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\b\d{6,}\b")
+_HAS_DIGIT = re.compile(r"\d").search   # C-level "contains a digit" test
+_WS_RE = re.compile(r"\s+")
+
+# Single alternation over all labels (longest first) so the invoice-no
+# cut-point is found in one scan instead of one str.find per label
+_LABEL_CUT_RE = re.compile(
+    "|".join(re.escape(l) for l in sorted(ALL_LABELS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+# Word-level trie over every label: one scan of the page matches all
+# labels at once instead of one sweep per label
+_LABEL_TRIE = {}
+for _label in LABELS.values():
+    _node = _LABEL_TRIE
+    for _token in _label.split():
+        _node = _node.setdefault(_token, {})
+    _node[None] = _label   # terminal marker -> full label text
+
+# Fast path: "Label ... value" pairs pulled straight from the raw page
+# text, one compiled pattern per field (value = rest of the line). The
+# lookbehind stops a label from matching inside a longer phrase ("Sub
+# Total" must not satisfy "Total"). Column-table fields are excluded:
+# their value sits in the column BELOW the label, so a same-line match
+# is wrong by construction for that template.
+_FAST_FIELD_RES = {
+    key: re.compile(r"(?<![A-Za-z])" + re.escape(label) + r"\s*:?\s*(.+)")
+    for key, label in LABELS.items()
+    if key not in COLUMN_TABLE_FIELDS
+}
+
 
 
 # --------------------------------------------------
@@ -38,7 +84,8 @@ COLUMN_TABLE_FIELDS = {
 def clean(text):
     if not text:
         return ""
-    return " ".join(text.split())
+    # Single C-level substitution; split/join would allocate a word list
+    return _WS_RE.sub(" ", text).strip()
 
 # POST-PROCESSING / NORMALIZATION
 def normalize_bill_data(value, mode):
@@ -47,19 +94,17 @@ def normalize_bill_data(value, mode):
 
     if mode == "invoice_no":
         # Cut off at any known label
-        for label in ALL_LABELS:
-            idx = value.lower().find(label)
-            if idx != -1:
-                value = value[:idx]
-                break
+        m = _LABEL_CUT_RE.search(value)
+        if m:
+            value = value[:m.start()]
         value = value.strip()
         # 1️⃣ Prefer PP + digits
-        pp_match = re.search(r"\bPP\d{6,}\b", value, re.IGNORECASE)
+        pp_match = _PP_RE.search(value)
         if pp_match:
             return pp_match.group(0).upper()
 
         # 2️⃣ Digits only → prepend PP
-        digit_match = re.search(r"\b\d{6,}\b", value)
+        digit_match = _DIGITS_RE.search(value)
         if digit_match:
             return "PP" + digit_match.group(0)
 
@@ -68,7 +113,7 @@ def normalize_bill_data(value, mode):
     if mode == "bill":
         return " ".join(value.split()[:2])
     elif mode =="total":
-        if "₹" not in value and any(c.isdigit() for c in value):
+        if "₹" not in value and _HAS_DIGIT(value):
                 return f"₹ {value}"
         return value
     
@@ -77,15 +122,83 @@ def normalize_bill_data(value, mode):
 # --------------------------------------------------
 # ! Text-based (non-scanned) PDF ---------------------------------------------------
 # --------------------------------------------------
-def text_based_pdf(file):
+def _fast_extract(text):
+    """Regex-only first pass over the raw page text.
+
+    Returns a partial {key: value} dict; anything missing or implausible
+    is left for the geometric word logic to resolve.
+    """
+    data = {}
+
+    for key, pattern in _FAST_FIELD_RES.items():
+        m = pattern.search(text)
+        if not m:
+            continue
+
+        value = m.group(1).strip()
+
+        # A value that starts with another label means we matched a header
+        # row; a label further in means the line carries a second field —
+        # keep only the part before it (mirrors the invoice-no normalizer)
+        cut = _LABEL_CUT_RE.search(value)
+        if cut:
+            if cut.start() == 0:
+                continue
+            value = value[:cut.start()].strip()
+            if not value:
+                continue
+
+        # Everything except the Bill fields should carry digits
+        if key not in {"Bill_From", "Bill_To"} and not _HAS_DIGIT(value):
+            continue
+
+        data[key] = value
+
+    return data
+
+
+def text_based_pdf(file, stream=None):
     data = {}
 
-    with pdfplumber.open(file) as pdf:
-            page = pdf.pages[0]
-            words = page.extract_words()
+    # Callers that already hold the file bytes (e.g. for hashing) pass
+    # them in so the file is not read from disk a second time
+    doc = fitz.open(stream=stream, filetype="pdf") if stream is not None else fitz.open(file)
+
+    with doc:
+            page = doc[0]
+
+            # Scanned check and extraction share one parse of the page
+            text = page.get_text()
+            if not text or not text.strip():
+                return None   # image-only / scanned PDF
+
+            # Cheap regex pass first; the word-layout machinery below only
+            # spins up for fields the fast path could not resolve
+            fast = _fast_extract(text)
+
+            if len(fast) < len(LABELS):
+                # Raw (x0, top, x1, bottom, text, block, line, wordno)
+                # tuples straight from fitz — no per-word dict allocation
+                words = page.get_text("words")
+
+                # Structure-of-arrays copy of the word boxes so the geometric
+                # filters run as vectorized NumPy masks instead of Python loops
+                n = len(words)
+                x0a = np.fromiter((w[0] for w in words), dtype=np.float32, count=n)
+                x1a = np.fromiter((w[2] for w in words), dtype=np.float32, count=n)
+                topa = np.fromiter((w[1] for w in words), dtype=np.float32, count=n)
+                bottoma = np.fromiter((w[3] for w in words), dtype=np.float32, count=n)
+                texts = np.array([w[4] for w in words], dtype=object)
+                word_arrays = (x0a, x1a, topa, bottoma, texts)
+
+                # Locate all 7 labels in one sweep of the page
+                label_matches = match_labels(words)
 
             for key, label in LABELS.items():
-                value = extract_value(page, words, label)
+                if key in fast:
+                    value = fast[key]
+                else:
+                    value = extract_value(word_arrays, label_matches, label)
                 if label == "Invoice No":
                     value = normalize_bill_data(value, "invoice_no")
                 if label in {"Bill From", "Bill To"}:
@@ -100,96 +213,123 @@ def text_based_pdf(file):
 # --------------------------------------------------
 # LABEL DETECTION
 # --------------------------------------------------
-def find_label(words, label_text):
-    label_words = label_text.split()
+def match_labels(words):
+    """One pass over the page words, matching every label via the trie.
 
-    for i in range(len(words) - len(label_words)):
-        if all(words[i + j]["text"] == label_words[j]
-               for j in range(len(label_words))):
-            return words[i:i + len(label_words)]
+    Words are fitz (x0, top, x1, bottom, text, ...) tuples. Returns
+    {label_text: [label words]} keeping the first occurrence, like the
+    old per-label scan did.
+    """
+    matches = {}
+    n = len(words)
+
+    for i in range(n):
+        node = _LABEL_TRIE
+        j = i
+        while j < n:
+            node = node.get(words[j][4])
+            if node is None:
+                break
+            label = node.get(None)
+            if label is not None and label not in matches:
+                matches[label] = words[i:j + 1]
+            j += 1
 
-    return None
+    return matches
 
 
 # --------------------------------------------------
 # EXTRACTION STRATEGIES
 # --------------------------------------------------
-def extract_right_of_label(page, label_words, max_width=200):
+# Both strategies filter the words already extracted for the page;
+# page.crop(...).extract_text() would re-run the layout engine per box
+
+def extract_right_of_label(word_arrays, label_words, max_width=200):
+    x0a, x1a, topa, bottoma, texts = word_arrays
     last = label_words[-1]
 
-    x0 = last["x1"] + 5
-    top = last["top"]
+    x0 = last[2] + 5
 
-    x1 = min(x0 + max_width, page.width)
-    bottom = last["bottom"]
+    # Same line as the label: box overlaps the label's vertical span
+    mask = ((x0a >= x0)
+            & (x0a < x0 + max_width)
+            & (topa < last[3])
+            & (bottoma > last[1]))
 
-    box = (x0, top, x1, bottom)
-    return clean(page.crop(box).extract_text())
+    order = np.argsort(x0a[mask], kind="stable")
+    return clean(" ".join(texts[mask][order]))
 
-def extract_below_label(page, label_words, height=40):
+def extract_below_label(word_arrays, label_words, height=40):
+    x0a, x1a, topa, bottoma, texts = word_arrays
     first = label_words[0]
 
-    x0 = first["x0"]
-    top = first["bottom"] + 5
+    x0 = first[0]
+    top = first[3] + 5
 
-    x1 = min(x0 + 200, page.width)
-    bottom = min(top + height, page.height)
+    mask = ((x0a >= x0)
+            & (x0a < x0 + 200)
+            & (topa >= top)
+            & (topa < top + height))
 
-    box = (x0, top, x1, bottom)
-    return clean(page.crop(box).extract_text())
+    # Reading order: top → bottom, then left → right
+    sel_x0 = x0a[mask]
+    order = np.lexsort((sel_x0, topa[mask]))
+    return clean(" ".join(texts[mask][order]))
 
-def extract_same_column_below_words(words, label_words, y_gap=5, max_height=60):
+def _col_filter(x0a, x1a, topa, col_left, col_right, label_bottom, y_gap, max_height):
+    # Must be below the label, with word center aligned to the column
+    centers = (x0a + x1a) * 0.5
+    return ((topa > label_bottom + y_gap)
+            & (topa < label_bottom + max_height)
+            & (centers >= col_left - 10)
+            & (centers <= col_right + 10))
+
+if njit is not None:
+    _col_filter = njit(cache=True)(_col_filter)
+
+def extract_same_column_below_words(word_arrays, label_words, y_gap=5, max_height=60):
     """
     Extract words directly below the label,
     whose horizontal CENTER aligns with the label column.
     """
 
-    col_left = min(w["x0"] for w in label_words)
-    col_right = max(w["x1"] for w in label_words)
-    label_bottom = max(w["bottom"] for w in label_words)
-
-    candidates = []
+    x0a, x1a, topa, bottoma, texts = word_arrays
 
-    for w in words:
-        # Must be below the label
-        if not (label_bottom + y_gap < w["top"] < label_bottom + max_height):
-            continue
-
-        # Word center must align with column center
-        word_center = (w["x0"] + w["x1"]) / 2
+    col_left = min(w[0] for w in label_words)
+    col_right = max(w[2] for w in label_words)
+    label_bottom = max(w[3] for w in label_words)
 
-        if col_left - 10 <= word_center <= col_right + 10:
-            candidates.append(w)
+    mask = _col_filter(x0a, x1a, topa,
+                       col_left, col_right, label_bottom, y_gap, max_height)
 
     # Sort left → right (₹ first, then number)
-    candidates.sort(key=lambda w: w["x0"])
+    order = np.argsort(x0a[mask], kind="stable")
 
-    return clean(" ".join(w["text"] for w in candidates))
+    return clean(" ".join(texts[mask][order]))
 
 
 # --------------------------------------------------
 # FIELD EXTRACTION ORCHESTRATOR
 # --------------------------------------------------
-def extract_value(page, words, label_text):
-    label_words = find_label(words, label_text)
+def extract_value(word_arrays, label_matches, label_text):
+    label_words = label_matches.get(label_text)
     if not label_words:
         return ""
 
     # 1️⃣ Column-table logic (CGST / SGST / Total)
     if label_text in COLUMN_TABLE_FIELDS:
-        value = extract_same_column_below_words(words, label_words)
+        value = extract_same_column_below_words(word_arrays, label_words)
         if value:
             return value
 
     # 2️⃣ Right-of-label logic
-    right = extract_right_of_label(page, label_words)
+    right = extract_right_of_label(word_arrays, label_words)
     if right:
-        right_lower = right.lower()
-        if right_lower not in ALL_LABELS and any(c.isdigit() for c in right):
+        if right.lower() not in ALL_LABELS and _HAS_DIGIT(right):
             return right
 
     # 3️⃣ Below-label logic
-    below = extract_below_label(page, label_words)
+    below = extract_below_label(word_arrays, label_words)
     if below:
         return below
 
@@ -199,41 +339,84 @@ def extract_value(page, words, label_text):
 
 
 # --------------------------------------------------
-# * Find Data Type(PDF)
+# * On-disk extraction cache
 # --------------------------------------------------
-def detect_pdf_type(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text and text.strip():
-                return "text_pdf"   # non-scanned
-    return "scanned_pdf"            # image-only
+# Re-runs over the same folder skip pdfminer entirely: results are stored
+# as one JSON file per content hash (safe with multiple worker processes)
 
+CACHE_DIR = ".invoice_cache"
 
-def process_invoice_folder(folder_path, output_csv="invoices.csv"):
-    rows = []
+def _cached_extract(file_path):
+    # Memory-map the file so one read serves both the cache key and the
+    # parser; the bytes stay in the OS page cache across worker processes
+    with open(file_path, "rb") as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        buf = bytes(mm)
 
-    pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")]
+    key = hashlib.blake2b(buf, digest_size=16).hexdigest()
 
-    for filename in pdf_files:
-        file_path = os.path.join(folder_path, filename)
+    cache_path = os.path.join(CACHE_DIR, key + ".json")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
 
-        pdf_type = detect_pdf_type(file_path)
+    data = text_based_pdf(file_path, stream=buf)
 
-        if pdf_type != "text_pdf":
-            print(f"Skipping scanned PDF: {filename}")
-            continue
+    if data is not None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    return data
+
+
+def _process_one(file_path):
+    """Process a single PDF file. Returns a row dict, or None for scanned PDFs."""
+    row = _cached_extract(file_path)
+
+    if row is None:
+        return None
 
-        row = text_based_pdf(file_path)
-        row["File_Name"] = filename   # helpful for traceability
-        rows.append(row)
+    row["File_Name"] = os.path.basename(file_path)   # helpful for traceability
+    return row
 
-    if not rows:
+
+def process_invoice_folder(folder_path, output_csv="invoices.csv"):
+    # scandir hands back DirEntry objects with name + path in one pass,
+    # no per-file stat or os.path.join needed
+    with os.scandir(folder_path) as it:
+        entries = [e for e in it if e.is_file() and e.name.lower().endswith(".pdf")]
+
+    pdf_files = [e.name for e in entries]
+    paths = [e.path for e in entries]
+
+    fieldnames = ["File_Name"] + list(LABELS.keys())
+    row_count = 0
+
+    # Stream each row to disk as its worker finishes instead of
+    # materializing the whole batch in memory first
+    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+
+        # * Each file is independent and parsing is CPU-bound inside pdfminer,
+        # * so fan the work out across cores instead of looping serially
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for filename, row in zip(pdf_files, executor.map(_process_one, paths, chunksize=4)):
+                if row is None:
+                    print(f"Skipping scanned PDF: {filename}")
+                    continue
+                writer.writerow(row)
+                row_count += 1
+
+    if not row_count:
         print("No data extracted.")
         return
 
-    write_to_csv(rows, output_csv)
-    
+    print(f"CSV saved as: {output_csv}")
+
 def write_to_csv(rows, filename):
     fieldnames = ["File_Name"] + list(LABELS.keys())
 
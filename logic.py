@@ -1,6 +1,7 @@
 import os
 import csv
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 class InvoiceExtractorLogic:
@@ -31,8 +32,11 @@ class InvoiceExtractorLogic:
                 log_callback(f"Error: Folder does not exist: {self.current_folder}")
             return []
         
-        pdf_files = [f for f in os.listdir(self.current_folder) if f.lower().endswith(".pdf")]
-        
+        # scandir gives name + full path per entry without a join per file
+        with os.scandir(self.current_folder) as it:
+            pdf_files = [(e.name, e.path) for e in it
+                         if e.is_file() and e.name.lower().endswith(".pdf")]
+
         if not pdf_files:
             if log_callback:
                 log_callback("No PDF files found in selected folder.")
@@ -45,32 +49,36 @@ class InvoiceExtractorLogic:
         processed_count = 0
         skipped_count = 0
         
-        for filename in pdf_files:
-            file_path = os.path.join(self.current_folder, filename)
-            
-            try:
-                # Detect PDF type
-                pdf_type = extract_invoice.detect_pdf_type(file_path)
-                
-                if pdf_type != "text_pdf":
+        # Parsing is CPU-bound (pdfminer holds the GIL), so use worker
+        # processes and report progress as each file completes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(extract_invoice._process_one, path): filename
+                for filename, path in pdf_files
+            }
+
+            for future in as_completed(futures):
+                filename = futures[future]
+
+                try:
+                    row = future.result()
+
+                    if row is None:
+                        if log_callback:
+                            log_callback(f"⚠ Skipping scanned PDF: {filename}")
+                        skipped_count += 1
+                        continue
+
+                    self.extracted_data.append(row)
+
+                    processed_count += 1
+                    if log_callback:
+                        log_callback(f"✓ Processed: {filename}")
+
+                except Exception as e:
                     if log_callback:
-                        log_callback(f"⚠ Skipping scanned PDF: {filename}")
+                        log_callback(f"✗ Error processing {filename}: {str(e)}")
                     skipped_count += 1
-                    continue
-                
-                # Extract data
-                row = extract_invoice.text_based_pdf(file_path)
-                row["File_Name"] = filename
-                self.extracted_data.append(row)
-                
-                processed_count += 1
-                if log_callback:
-                    log_callback(f"✓ Processed: {filename}")
-                
-            except Exception as e:
-                if log_callback:
-                    log_callback(f"✗ Error processing {filename}: {str(e)}")
-                skipped_count += 1
         
         if log_callback:
             log_callback("-" * 50)
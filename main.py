@@ -1,4 +1,5 @@
 import sys
+import time
 from PySide6.QtWidgets import QApplication, QFileDialog, QMessageBox
 from PySide6.QtCore import QThread, Signal
 from ui import InvoiceExtractorUI
@@ -7,21 +8,40 @@ from logic import InvoiceExtractorLogic
 
 class ProcessingThread(QThread):
     """Background thread for processing invoices"""
-    log_message = Signal(str)
+    log_batch = Signal(list)
     processing_complete = Signal(list)
-    
+
+    # Each emit is a queued cross-thread call, so log lines are buffered
+    # and flushed in batches instead of one signal per message
+    FLUSH_COUNT = 50
+    FLUSH_INTERVAL = 0.1   # seconds
+
     def __init__(self, logic):
         super().__init__()
         self.logic = logic
-    
+        self._log_buf = []
+        self._last_flush = 0.0
+
     def run(self):
         """Run the processing in background"""
+        self._last_flush = time.monotonic()
         data = self.logic.process_invoices(log_callback=self.emit_log)
+        self._flush_logs()
         self.processing_complete.emit(data)
-    
+
     def emit_log(self, message):
-        """Emit log message to UI"""
-        self.log_message.emit(message)
+        """Buffer a log message; flush to the UI in batches"""
+        self._log_buf.append(message)
+        if (len(self._log_buf) >= self.FLUSH_COUNT
+                or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+            self._flush_logs()
+
+    def _flush_logs(self):
+        """Emit buffered log lines as a single batch"""
+        if self._log_buf:
+            self.log_batch.emit(self._log_buf)
+            self._log_buf = []
+        self._last_flush = time.monotonic()
 
 
 class InvoiceExtractorApp:
@@ -52,7 +72,7 @@ class InvoiceExtractorApp:
         
         # Create and start processing thread
         self.processing_thread = ProcessingThread(self.logic)
-        self.processing_thread.log_message.connect(self.ui.add_log)
+        self.processing_thread.log_batch.connect(self.ui.add_logs)
         self.processing_thread.processing_complete.connect(self.on_processing_complete)
         self.processing_thread.start()
     
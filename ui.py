@@ -1,10 +1,83 @@
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem,
-    QTextEdit, QLabel, QFileDialog, QHeaderView, QFrame, QScrollArea
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QTableView, QAbstractItemView,
+    QPlainTextEdit, QLabel, QFileDialog, QHeaderView, QFrame
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex, QTimer, QFile
+from PySide6.QtGui import QFont, QTextCursor
+import os
+
+
+def _load_stylesheet():
+    """Load the application stylesheet.
+
+    Prefers the rcc-compiled Qt resource (regenerate with
+    `pyside6-rcc resources.qrc -o resources_rc.py`), falling back to
+    reading styles.qss from disk when no compiled resource is present.
+    """
+    try:
+        import resources_rc  # noqa: F401 — registers :/styles.qss
+        f = QFile(":/styles.qss")
+        if f.open(QFile.OpenModeFlag.ReadOnly):
+            try:
+                return bytes(f.readAll()).decode("utf-8")
+            finally:
+                f.close()
+    except ImportError:
+        pass
+
+    qss_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles.qss")
+    with open(qss_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class InvoiceTableModel(QAbstractTableModel):
+    """Read-only model serving extracted rows straight from the list of dicts.
+
+    No per-cell item objects are allocated; the view only asks for the
+    cells that are actually visible.
+    """
+
+    # The extraction pipeline always emits the same columns, so the
+    # header row is fixed up front and repopulates only touch row data
+    HEADERS = ("File_Name", "Invoice_No", "Bill_From", "Bill_To",
+               "Invoice_Date", "CGST", "SGST", "Total")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = []
+        self._headers = list(self.HEADERS)
+        self._row_count = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (role == Qt.ItemDataRole.DisplayRole
+                and orientation == Qt.Orientation.Horizontal):
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._columns[index.column()][index.row()]
+        return None
+
+    def set_rows(self, data):
+        """Swap in a new batch of rows with a single model reset"""
+        self.beginResetModel()
+        # Columnar layout: one tight comprehension per column up front,
+        # so data() is two list indexes — no dict lookup or str() per
+        # visible cell while scrolling
+        self._columns = [
+            [str(row.get(h, "")) for row in data]
+            for h in self._headers
+        ]
+        self._row_count = len(data)
+        self.endResetModel()
 
 
 class InvoiceExtractorUI(QMainWindow):
@@ -16,6 +89,9 @@ class InvoiceExtractorUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.selected_folder = ""
+        self._folder_dialog = None
+        self._record_count = 0
+        self._column_widths = None
         self.init_ui()
         self.apply_global_stylesheet()
     
@@ -36,13 +112,8 @@ class InvoiceExtractorUI(QMainWindow):
         header_frame = self.create_header()
         main_layout.addWidget(header_frame)
         
-        # Scroll Area for content
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setFrameShape(QFrame.Shape.NoFrame)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        
-        # Content Area
+        # Content Area (no outer QScrollArea: the table scrolls itself,
+        # and nesting scroll viewports doubles the layout passes)
         content_widget = QWidget()
         content_layout = QVBoxLayout(content_widget)
         content_layout.setSpacing(24)
@@ -51,21 +122,19 @@ class InvoiceExtractorUI(QMainWindow):
         # Action Cards Section
         action_frame = self.create_action_section()
         content_layout.addWidget(action_frame)
-        
-        # Folder Selection Display
-        self.folder_display_frame = self.create_folder_display()
-        content_layout.addWidget(self.folder_display_frame)
-        
+
         # Results table
         table_container = self.create_table_section()
         content_layout.addWidget(table_container, stretch=3)
-        
-        # Logs section
-        log_container = self.create_log_section()
-        content_layout.addWidget(log_container, stretch=1)
-        
-        scroll_area.setWidget(content_widget)
-        main_layout.addWidget(scroll_area)
+
+        # Folder display and log pane are built lazily on first use —
+        # fewer widgets to construct and polish at startup
+        self.content_layout = content_layout
+        self.folder_display_frame = None
+        self.log_container = None
+        self._log_buffer = []
+
+        main_layout.addWidget(content_widget)
     
     def create_header(self):
         """Create the application header with gradient background"""
@@ -98,9 +167,8 @@ class InvoiceExtractorUI(QMainWindow):
             "Choose invoice PDFs"
         )
         select_card.setObjectName("selectCard")
-        self.select_folder_btn = select_card.button
-        self.select_folder_btn.setObjectName("selectBtn")
-        self.select_folder_btn.clicked.connect(self.on_select_folder)
+        self.select_folder_btn = select_card
+        self.select_folder_btn.clicked.connect(self.on_select_folder, Qt.ConnectionType.DirectConnection)
         action_layout.addWidget(select_card)
         
         # Process Card
@@ -109,10 +177,9 @@ class InvoiceExtractorUI(QMainWindow):
             "Extract data"
         )
         process_card.setObjectName("processCard")
-        self.process_btn = process_card.button
-        self.process_btn.setObjectName("processBtn")
+        self.process_btn = process_card
         self.process_btn.setEnabled(False)
-        self.process_btn.clicked.connect(self.on_process)
+        self.process_btn.clicked.connect(self.on_process, Qt.ConnectionType.DirectConnection)
         action_layout.addWidget(process_card)
         
         # Export Card
@@ -121,57 +188,23 @@ class InvoiceExtractorUI(QMainWindow):
             "Download CSV"
         )
         export_card.setObjectName("exportCard")
-        self.export_btn = export_card.button
-        self.export_btn.setObjectName("exportBtn")
+        self.export_btn = export_card
         self.export_btn.setEnabled(False)
-        self.export_btn.clicked.connect(self.on_export)
+        self.export_btn.clicked.connect(self.on_export, Qt.ConnectionType.DirectConnection)
         action_layout.addWidget(export_card)
         
         return action_frame
     
     def create_action_card(self, icon, title, subtitle):
         """Create a styled action button card"""
-        # Create a container widget instead of putting layout in button
-        container = QWidget()
-        container.setObjectName("cardContainer")
-        container.setMinimumHeight(120)
-        container.setCursor(Qt.CursorShape.PointingHandCursor)
-        
-        # Create the actual button
-        btn = QPushButton(container)
-        btn.setGeometry(0, 0, 1000, 120)  # Will be resized by parent
-        btn.setObjectName("cardButton")
-        
-        # Create layout for labels
-        layout = QVBoxLayout(container)
-        layout.setSpacing(5)
-        layout.setContentsMargins(10, 20, 10, 20)
-        
-        # Icon
-        icon_label = QLabel(icon)
-        icon_label.setObjectName("cardIcon")
-        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        icon_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
-        layout.addWidget(icon_label)
-        
-        # Title
-        title_label = QLabel(title)
-        title_label.setObjectName("cardTitle")
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
-        layout.addWidget(title_label)
-        
-        # Subtitle
-        subtitle_label = QLabel(subtitle)
-        subtitle_label.setObjectName("cardSubtitle")
-        subtitle_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
-        layout.addWidget(subtitle_label)
-        
-        # Store the button reference so we can connect signals
-        container.button = btn
-        
-        return container
+        # One widget per card: the button draws the whole card itself
+        # instead of a container + overlay button + three labels, which
+        # cost five widgets of polish and hit-testing per card
+        btn = QPushButton(f"{icon}\n{title}\n{subtitle}")
+        btn.setProperty("card", True)
+        btn.setMinimumHeight(120)
+        btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        return btn
     
     def create_folder_display(self):
         """Create folder selection display area"""
@@ -212,12 +245,14 @@ class InvoiceExtractorUI(QMainWindow):
         
         layout.addLayout(header_layout)
         
-        # Table
-        self.table = QTableWidget()
+        # Table (view + model: rows are rendered lazily on demand)
+        self.table_model = InvoiceTableModel(self)
+        self.table = QTableView()
         self.table.setObjectName("dataTable")
+        self.table.setModel(self.table_model)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.verticalHeader().setVisible(False)
         layout.addWidget(self.table)
         
@@ -235,270 +270,58 @@ class InvoiceExtractorUI(QMainWindow):
         log_label.setObjectName("sectionHeader")
         layout.addWidget(log_label)
         
-        self.log_text = QTextEdit()
+        # Plain-text layout is far cheaper than QTextEdit's rich text,
+        # and the block cap keeps scrollback memory bounded
+        self.log_text = QPlainTextEdit()
         self.log_text.setObjectName("logText")
         self.log_text.setReadOnly(True)
         self.log_text.setMaximumHeight(180)
+        self.log_text.setMaximumBlockCount(2000)
         layout.addWidget(self.log_text)
+
+        # Messages are buffered and flushed to the widget at 10 Hz so
+        # heavy logging doesn't repaint the pane per line
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(100)
+        self._log_timer.timeout.connect(self._flush_logs)
+        self._log_timer.start()
         
         return container
     
     def apply_global_stylesheet(self):
-        """Apply comprehensive stylesheet to the application"""
-        self.setStyleSheet("""
-            /* Main Window */
-            QMainWindow {
-                background-color: #f8f9fa;
-            }
-            
-            /* Header Section */
-            #headerFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #667eea, stop:1 #764ba2);
-                border: none;
-            }
-            
-            #mainTitle {
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 32px;
-                font-weight: 700;
-                color: white;
-                letter-spacing: -0.5px;
-            }
-            
-            #subtitle {
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 15px;
-                color: rgba(255, 255, 255, 0.9);
-                margin-top: 5px;
-                font-weight: 400;
-            }
-            
-            /* Action Cards */
-            #cardContainer {
-                background: white;
-                border: 2px solid #e3e8ef;
-                border-radius: 12px;
-            }
-            
-            #selectCard:hover {
-                border: 2px solid #667eea;
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #f0f3ff, stop:1 #faf5ff);
-            }
-            
-            #processCard:hover {
-                border: 2px solid #f5576c;
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #fff5f7, stop:1 #fff0f3);
-            }
-            
-            #exportCard:hover {
-                border: 2px solid #00f2fe;
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #f0fdff, stop:1 #f0fcff);
-            }
-            
-            #cardButton {
-                background: transparent;
-                border: none;
-            }
-            
-            #cardIcon {
-                font-size: 36px;
-                background: transparent;
-                border: none;
-            }
-            
-            #cardTitle {
-                font-size: 16px;
-                font-weight: 700;
-                color: #1e293b;
-                background: transparent;
-                border: none;
-            }
-            
-            #cardSubtitle {
-                font-size: 12px;
-                color: #64748b;
-                background: transparent;
-                border: none;
-            }
-            
-            /* Folder Display */
-            #folderDisplay {
-                background-color: white;
-                border: 2px solid #e3e8ef;
-                border-radius: 10px;
-                padding: 5px;
-            }
-            
-            #folderHeader {
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 13px;
-                font-weight: 600;
-                color: #6366f1;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            
-            #folderPath {
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 13px;
-                color: #1e293b;
-                padding: 5px 0;
-            }
-            
-            /* Section Headers */
-            #sectionHeader {
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 18px;
-                font-weight: 700;
-                color: #1e293b;
-                padding: 10px 0;
-            }
-            
-            #recordCount {
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 13px;
-                font-weight: 600;
-                color: #6366f1;
-                background-color: #eef2ff;
-                padding: 6px 14px;
-                border-radius: 20px;
-            }
-            
-            /* Table Styling */
-            #dataTable {
-                background-color: white;
-                border: 2px solid #e3e8ef;
-                border-radius: 10px;
-                gridline-color: #f1f5f9;
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 13px;
-                selection-background-color: #eef2ff;
-                selection-color: #1e293b;
-            }
-            
-            #dataTable::item {
-                padding: 12px 8px;
-                border: none;
-            }
-            
-            #dataTable::item:alternate {
-                background-color: #f8fafc;
-            }
-            
-            #dataTable::item:selected {
-                background-color: #eef2ff;
-                color: #1e293b;
-            }
-            
-            QHeaderView::section {
-                background-color: #f1f5f9;
-                color: #475569;
-                font-family: 'Segoe UI', Arial, sans-serif;
-                font-size: 12px;
-                font-weight: 700;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-                padding: 14px 8px;
-                border: none;
-                border-bottom: 2px solid #cbd5e1;
-            }
-            
-            QHeaderView::section:first {
-                border-top-left-radius: 8px;
-            }
-            
-            QHeaderView::section:last {
-                border-top-right-radius: 8px;
-            }
-            
-            /* Log Container */
-            #logContainer {
-                background-color: white;
-                border: 2px solid #e3e8ef;
-                border-radius: 10px;
-                padding: 15px;
-            }
-            
-            #logText {
-                background-color: #0f172a;
-                color: #e2e8f0;
-                border: none;
-                border-radius: 8px;
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 12px;
-                padding: 12px;
-                line-height: 1.6;
-            }
-            
-            /* Scrollbars */
-            QScrollBar:vertical {
-                background: #f1f5f9;
-                width: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }
-            
-            QScrollBar::handle:vertical {
-                background: #cbd5e1;
-                border-radius: 6px;
-                min-height: 30px;
-            }
-            
-            QScrollBar::handle:vertical:hover {
-                background: #94a3b8;
-            }
-            
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-            
-            QScrollBar:horizontal {
-                background: #f1f5f9;
-                height: 12px;
-                border-radius: 6px;
-                margin: 0px;
-            }
-            
-            QScrollBar::handle:horizontal {
-                background: #cbd5e1;
-                border-radius: 6px;
-                min-width: 30px;
-            }
-            
-            QScrollBar::handle:horizontal:hover {
-                background: #94a3b8;
-            }
-            
-            QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
-                width: 0px;
-            }
-        """)
+        """Apply the application-wide stylesheet once per QApplication"""
+        # Parsing the sheet and polishing descendants is a startup hotspot;
+        # applying at application scope lets Qt reuse its cached stylesheet
+        # instead of re-parsing for every window constructed
+        app = QApplication.instance()
+        if not app.property("_styled"):
+            app.setStyleSheet(_load_stylesheet())
+            app.setProperty("_styled", True)
     
     def on_select_folder(self):
         """Handle folder selection"""
-        folder = QFileDialog.getExistingDirectory(
-            self,
-            "Select Invoice Folder",
-            "",
-            QFileDialog.Option.ShowDirsOnly
-        )
-        
+        # One dialog for the app's lifetime: constructing a QFileDialog
+        # per click rebuilds its filesystem model and icon lookups
+        if self._folder_dialog is None:
+            self._folder_dialog = QFileDialog(self, "Select Invoice Folder")
+            self._folder_dialog.setFileMode(QFileDialog.FileMode.Directory)
+            self._folder_dialog.setOption(QFileDialog.Option.ShowDirsOnly, True)
+
+        folder = ""
+        if self._folder_dialog.exec():
+            selected = self._folder_dialog.selectedFiles()
+            folder = selected[0] if selected else ""
+
         if folder:
             self.selected_folder = folder
+            self._ensure_folder_display()
             self.folder_label.setText(folder)
-            self.folder_display_frame.setStyleSheet("""
-                #folderDisplay {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 #ecfdf5, stop:1 #d1fae5);
-                    border: 2px solid #10b981;
-                    border-radius: 10px;
-                    padding: 5px;
-                }
-            """)
+            # The "selected" look lives in the global sheet; toggling the
+            # property repolishes just this frame instead of reparsing CSS
+            self.folder_display_frame.setProperty("state", "selected")
+            style = self.folder_display_frame.style()
+            style.unpolish(self.folder_display_frame)
+            style.polish(self.folder_display_frame)
             self.process_btn.setEnabled(True)
             self.folder_selected.emit(folder)
     
@@ -516,47 +339,79 @@ class InvoiceExtractorUI(QMainWindow):
         Args:
             data: List of dictionaries containing invoice data
         """
+        self._record_count = len(data)
         if not data:
-            self.table.setRowCount(0)
-            self.table.setColumnCount(0)
+            self.table_model.set_rows([])
             self.record_count_label.setText("0 records")
             return
-        
-        # Get headers from first row
-        headers = list(data[0].keys())
-        
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        
-        # Populate cells
-        for row_idx, row_data in enumerate(data):
-            for col_idx, header in enumerate(headers):
-                value = str(row_data.get(header, ""))
-                item = QTableWidgetItem(value)
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row_idx, col_idx, item)
-        
-        # Resize columns to content
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        
+
+        # One model reset; the view pulls only visible cells
+        self.table_model.set_rows(data)
+
+        # Measure columns on the first populate only; repopulates reuse the
+        # cached widths instead of re-measuring every cell
+        header = self.table.horizontalHeader()
+        if self._column_widths is None:
+            header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+            self.table.resizeColumnsToContents()
+            self._column_widths = [
+                header.sectionSize(col) for col in range(self.table_model.columnCount())
+            ]
+        else:
+            for col, width in enumerate(self._column_widths):
+                self.table.setColumnWidth(col, width)
+        header.setStretchLastSection(True)
+
         # Update record count
         self.record_count_label.setText(f"{len(data)} records")
-        
+
         # Enable export button
         self.export_btn.setEnabled(True)
     
+    def _ensure_log_section(self):
+        """Build the log pane the first time something is logged"""
+        if self.log_container is None:
+            self.log_container = self.create_log_section()
+            self.content_layout.addWidget(self.log_container, stretch=1)
+
+    def _ensure_folder_display(self):
+        """Build the folder display the first time a folder is picked"""
+        if self.folder_display_frame is None:
+            self.folder_display_frame = self.create_folder_display()
+            # Directly below the action cards
+            self.content_layout.insertWidget(1, self.folder_display_frame)
+
     def add_log(self, message):
-        """Add a log message to the log text area"""
-        self.log_text.append(message)
-    
+        """Queue a log message for the next flush"""
+        self._ensure_log_section()
+        self._log_buffer.append(message)
+
+    def add_logs(self, messages):
+        """Queue a batch of log messages for the next flush"""
+        self._ensure_log_section()
+        self._log_buffer.extend(messages)
+
+    def _flush_logs(self):
+        """Write any buffered messages in a single widget update"""
+        if self._log_buffer:
+            # Insert at the end and scroll once, instead of append()'s
+            # per-call scroll-and-relayout path
+            cursor = self.log_text.textCursor()
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText("\n".join(self._log_buffer) + "\n")
+            self._log_buffer.clear()
+
+            scrollbar = self.log_text.verticalScrollBar()
+            scrollbar.setValue(scrollbar.maximum())
+
     def clear_logs(self):
         """Clear all log messages"""
-        self.log_text.clear()
+        self._log_buffer.clear()
+        if self.log_container is not None:
+            self.log_text.clear()
     
     def set_processing_state(self, is_processing):
         """Enable/disable buttons during processing"""
         self.select_folder_btn.setEnabled(not is_processing)
         self.process_btn.setEnabled(not is_processing and bool(self.selected_folder))
-        self.export_btn.setEnabled(not is_processing and self.table.rowCount() > 0)
\ No newline at end of file
+        self.export_btn.setEnabled(not is_processing and self._record_count > 0)
\ No newline at end of file
@@ -1,23 +1,146 @@
 import os
+import io
 import json
 import csv
 import re
-import pdfplumber
-from groq import Groq
-from dotenv import load_dotenv
-from PIL import Image
-import pytesseract
-from pdf2image import convert_from_path
+import time
+import gzip
+import hashlib
+import tempfile
+import threading
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# One tesseract thread per worker process — the process pool already
+# fills every core, and N workers x M OpenMP threads run slower than
+# N workers x 1 thread
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import orjson  # ~2-3x faster than stdlib json; optional
+except ImportError:
+    orjson = None
+
+try:
+    # In-process tesseract API: no subprocess spawn or model reload per
+    # call; optional, the pytesseract CLI path remains the fallback
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+except ImportError:
+    PyTessBaseAPI = None
+
+# pdfplumber, groq, PIL and friends are imported inside the functions
+# that need them — together they add a few hundred ms of cold start that
+# short runs (missing folder, all cache hits) never have to pay
+aclient = None
+
+def _get_client():
+    """Create the async Groq client on first use"""
+    global aclient
+    if aclient is None:
+        from dotenv import load_dotenv
+        from groq import AsyncGroq
+        load_dotenv()
+        aclient = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+    return aclient
 
 AI_MODEL = "llama-3.3-70b-versatile"
 PDF_FOLDER = "invoices"
 OUTPUT_CSV = "output.csv"
-DEBUG_MODE = True
+# Opt-in via INVOICE_DEBUG=1 — debug output stays off the hot path by default
+DEBUG_MODE = os.getenv('INVOICE_DEBUG') == '1'
+
+def log(*args, **kwargs):
+    """Per-file progress/report output — silent unless INVOICE_DEBUG=1.
+
+    print flushes stdout synchronously, which serializes parallel workers;
+    errors and run-level summaries still use print unconditionally.
+    """
+    if DEBUG_MODE:
+        print(*args, **kwargs)
+
+CACHE_DIR = "._cache"
+TEXT_CACHE_DIR = "._text_cache"
+PROMPT_VERSION = "v1"  # bump when the prompt changes to invalidate old entries
 
 IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+SUPPORTED_EXTENSIONS = ('.pdf',) + IMAGE_EXTENSIONS
+_SUPPORTED_EXT_SET = frozenset(SUPPORTED_EXTENSIONS)
+
+# Compiled once at import — these patterns run on every AI response and
+# every numeric field, so re-parsing them per call is wasted work
+_FENCE_RE = re.compile(r'```(?:json)?\s*')
+_JSON_DECODER = json.JSONDecoder()
+# Fixed character class — a C-level translate table beats a regex state
+# machine for this; multi-char currency codes still need the regex below,
+# run against a lowercased copy so the pattern needs no IGNORECASE
+_CURRENCY_STRIP = str.maketrans('', '', '₹$, \t\r\n')
+_CURRENCY_CODE_RE = re.compile(r'(rs|sar|usd|aed|inr|eur|gbp)')
+
+def _extract_json(raw):
+    """
+    Pull the first JSON object out of an AI response.
+
+    raw_decode parses from the first '{' and stops at the end of the
+    object — no greedy DOTALL scan over the whole response and no
+    intermediate match string, and trailing prose is ignored for free.
+    """
+    if orjson is not None:
+        # Fast path: at temperature 0 the model usually returns pure JSON
+        try:
+            obj = orjson.loads(raw)
+            if isinstance(obj, dict):
+                return obj
+        except orjson.JSONDecodeError:
+            pass
+    i = raw.find('{')
+    if i == -1:
+        return None
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(raw, i)
+        return obj
+    except json.JSONDecodeError:
+        return None
+
+# A tax label followed closely by a digit — means the flat page text
+# already carries the tax summary amounts
+_TAX_HINT_RE = re.compile(r'(?:CGST|SGST|IGST)[^\d\n]{0,30}\d')
+
+# A detected table is only worth serializing if its header row looks
+# tax/amount related — pdfplumber also "finds" address blocks and
+# page-header grids
+_TABLE_KEEP_RE = re.compile(r'gstin|cgst|sgst|igst|tax|total|amount|taxable')
+
+# Lines worth keeping when the prompt has to shrink (matched lowercase)
+_KEY_LINE_RE = re.compile(
+    r'gstin|cgst|sgst|igst|total|invoice|date|bill\s*to|buyer'
+    r'|taxable|place\s*of\s*supply|m/s')
+_PAGE_BANNER_RE = re.compile(r'^--- PAGE \d+ ---$')
+
+def _compress_for_llm(text, budget=8000):
+    """
+    Shrink the prompt payload without losing the fields we extract.
+
+    A blind prefix cut spends the token budget on multi-page boilerplate
+    and drops the tax summary at the bottom. Instead keep the header
+    block (seller/buyer details live there) plus any later line carrying
+    a key label, drop the page banners, and hard-cap the result.
+    """
+    lines = text.split('\n')
+    if len(text) <= budget:
+        return '\n'.join(ln for ln in lines if not _PAGE_BANNER_RE.match(ln.strip()))
+
+    # One lowercase copy of the whole text, split alongside the original
+    lower_lines = text.lower().split('\n')
+    kept = []
+    for idx, line in enumerate(lines):
+        if _PAGE_BANNER_RE.match(line.strip()):
+            continue
+        if idx < 30 or _KEY_LINE_RE.search(lower_lines[idx]):
+            kept.append(line)
+    return '\n'.join(kept)[:budget]
+
+# Guards CSV writes in case results are ever committed off the main thread
+_csv_lock = threading.Lock()
 
 FIELDS = [
     "Invoice_no",
@@ -35,91 +158,490 @@ FIELDS = [
 # ---------------------------
 # OCR FUNCTIONS
 # ---------------------------
+def _prep_for_ocr(img, max_edge=1800):
+    """Grayscale + downscale (+ binarize when cv2 is around) before OCR.
+
+    Tesseract runtime is roughly linear in pixel count, so capping the
+    long edge cuts time on over-rasterized source images without hurting
+    recognition of normal print sizes. Pages we rasterized ourselves at
+    OCR_DPI are already sized — those callers pass max_edge=None, since
+    downscaling them again would land below the DPI floor.
+    """
+    from PIL import Image
+    img = img.convert('L')
+    if max_edge and max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    try:
+        import cv2
+        import numpy as np
+        arr = cv2.adaptiveThreshold(
+            np.asarray(img), 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10)
+        img = Image.fromarray(arr)
+    except ImportError:
+        pass  # grayscale alone is fine; binarization is just a bonus
+    return img
+
 def extract_text_from_image(image_path):
+    from PIL import Image
     try:
-        print(f"   🔍 Running OCR on image...")
-        img = Image.open(image_path).convert('L')
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(img, config=custom_config)
-        print(f"   ✅ OCR completed: {len(text)} characters extracted")
+        log(f"   🔍 Running OCR on image...")
+        # Image.open only reads the header, so the size check is free
+        with Image.open(image_path) as img:
+            if (PyTessBaseAPI is None and max(img.size) <= 1800
+                    and img.format in ('PNG', 'JPEG', 'TIFF', 'BMP')):
+                # Small file in a format tesseract reads natively: hand it
+                # the path and skip PIL's decode plus the temp-file
+                # round-trip pytesseract does for in-memory images
+                import pytesseract
+                text = pytesseract.image_to_string(image_path, config=OCR_CONFIG)
+            else:
+                text = _ocr_image(_prep_for_ocr(img))
+        log(f"   ✅ OCR completed: {len(text)} characters extracted")
         return text
     except Exception as e:
         print(f"   ❌ OCR Error: {e}")
         return ""
 
-def is_scanned_pdf(pdf_path):
+def _looks_scanned_fast(pdf_path):
+    """Page-1 scanned check via PDFium, skipping the pdfplumber open.
+
+    PDFium reads the first page's text in milliseconds, so scanned files
+    jump straight to OCR without building pdfminer's object model first.
+    Returns True/False, or None when pypdfium2 isn't installed (the
+    caller then falls back to the pdfplumber-based check).
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            text = first_page.extract_text()
-            if not text or len(text.strip()) < 50:
-                return True
-            images = first_page.images
-            if len(images) > 0 and len(text.strip()) < 200:
-                return True
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page = pdf[0]
+            text = page.get_textpage().get_text_range()
+            n_images = sum(
+                1 for obj in page.get_objects()
+                if obj.type == pdfium.raw.FPDF_PAGEOBJ_IMAGE)
+        finally:
+            pdf.close()
+        stripped = text.strip() if text else ""
+        if len(stripped) < 50:
+            return True
+        if n_images > 0 and len(stripped) < 200:
+            return True
+        return False
+    except Exception:
+        return None  # unreadable via PDFium — let pdfplumber decide
+
+def _looks_scanned(first_page):
+    """Scanned-PDF heuristic, applied to an already-open first page"""
+    try:
+        text = first_page.extract_text()
+        stripped = text.strip() if text else ""
+        if len(stripped) < 50:
+            return True
+        # .images re-walks the content stream — only ask when the text
+        # is short enough for the answer to matter
+        if len(stripped) < 200 and first_page.images:
+            return True
         return False
     except Exception as e:
         print(f"   ⚠️  Error checking PDF type: {e}")
         return False
 
+_tess_local = threading.local()
+
+def _get_tess_api():
+    """Per-thread tesserocr instance — the model loads once per thread and
+    stays resident; Tesseract's C core releases the GIL, so threads give
+    real page-level parallelism"""
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        api = _tess_local.api = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK, oem=OEM.LSTM_ONLY)
+    return api
+
+def _ocr_image(image):
+    """OCR one PIL image, in-process when tesserocr is available"""
+    if PyTessBaseAPI is not None:
+        api = _get_tess_api()
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    import pytesseract
+    return pytesseract.image_to_string(image, config=OCR_CONFIG)
+
+# Pages per tesseract invocation — long filelists can stall on the pipe
+# buffer, and chunks also give the thread pool units to overlap
+_OCR_BATCH_SIZE = 50
+
+# 200 DPI is a safe floor for printed GST invoices and processes a quarter
+# of the pixels 300 DPI does; oem 1 is LSTM-only, skipping the slower
+# combined legacy engine (tesserocr already pins OEM.LSTM_ONLY)
+OCR_DPI = 200
+OCR_CONFIG = r'--oem 1 --psm 6'
+
+def _ocr_filelist(filelist_path):
+    """One tesseract invocation over a filelist of page images"""
+    import pytesseract
+    return pytesseract.image_to_string(filelist_path, config=OCR_CONFIG)
+
+def _rasterize_to_dir(pdf_path, tmpdir):
+    """Render each page to a grayscale file in tmpdir, one page in RAM at a time.
+
+    PyMuPDF rasterizes in-process straight to grayscale — no Poppler
+    subprocess, no RGB->L conversion copy. When it isn't installed the
+    Poppler path still streams pages to disk via paths_only.
+    """
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+    if fitz is not None:
+        paths = []
+        with fitz.open(pdf_path) as doc:
+            for i, page in enumerate(doc, start=1):
+                pix = page.get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+                path = os.path.join(tmpdir, f"page{i:04d}.png")
+                pix.save(path)
+                paths.append(path)
+        return paths
+
+    from pdf2image import convert_from_path
+    # Already in page order — sorting would interleave the per-thread
+    # uuid prefixes and misorder unpadded page numbers
+    return convert_from_path(
+        pdf_path, dpi=OCR_DPI, output_folder=tmpdir, fmt='tiff',
+        paths_only=True, thread_count=os.cpu_count())
+
 def extract_text_from_scanned_pdf(pdf_path):
+    from PIL import Image
     try:
-        print(f"   🔍 Converting PDF to images for OCR...")
-        images = convert_from_path(pdf_path, dpi=300)
-        print(f"   📄 Processing {len(images)} page(s)...")
-        
-        full_text = []
-        for i, image in enumerate(images, start=1):
-            print(f"   📖 OCR on page {i}/{len(images)}...")
-            full_text.append(f"\n--- PAGE {i} ---\n")
-            image = image.convert('L')
-            custom_config = r'--oem 3 --psm 6'
-            page_text = pytesseract.image_to_string(image, config=custom_config)
-            full_text.append(page_text)
-        
-        result = "\n".join(full_text)
-        print(f"   ✅ OCR completed: {len(result)} characters extracted")
+        log(f"   🔍 Converting PDF to images for OCR...")
+        with tempfile.TemporaryDirectory(prefix="ocr_") as tmpdir:
+            page_paths = _rasterize_to_dir(pdf_path, tmpdir)
+            if not page_paths:
+                return ""
+            log(f"   📄 Processing {len(page_paths)} page(s)...")
+
+            if PyTessBaseAPI is not None:
+                # Resident in-process APIs, one per thread: pages OCR in
+                # parallel (Tesseract releases the GIL) with one image in
+                # memory per worker. Modest cap — more threads just thrash.
+                def _ocr_page_file(path):
+                    with Image.open(path) as image:
+                        text = _ocr_image(_prep_for_ocr(image, max_edge=None))
+                    os.unlink(path)
+                    return text
+
+                workers = min(4, os.cpu_count() or 1, len(page_paths))
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    page_texts = list(ex.map(_ocr_page_file, page_paths))
+            else:
+                # Batch mode: tesseract loads its LSTM model once per
+                # filelist and iterates the pages internally, instead of
+                # paying the subprocess spawn + model load per page
+                for path in page_paths:
+                    with Image.open(path) as image:
+                        prepped = _prep_for_ocr(image, max_edge=None)
+                    prepped.save(path)
+
+                filelists = []
+                for start in range(0, len(page_paths), _OCR_BATCH_SIZE):
+                    chunk = page_paths[start:start + _OCR_BATCH_SIZE]
+                    flist = os.path.join(tmpdir, f"filelist{start}.txt")
+                    with open(flist, "w") as f:
+                        f.write("\n".join(chunk))
+                    filelists.append(flist)
+
+                with ThreadPoolExecutor(max_workers=min(8, len(filelists))) as ex:
+                    chunk_texts = list(ex.map(_ocr_filelist, filelists))
+
+                # Tesseract separates pages with form feeds and appends a
+                # trailing one per invocation — strip the phantom empty
+                # page per chunk, or every chunk boundary shifts the
+                # page numbering
+                page_texts = []
+                for ct in chunk_texts:
+                    pages = ct.split("\f")
+                    while pages and not pages[-1].strip():
+                        pages.pop()
+                    page_texts.extend(pages)
+
+        # Same single growing buffer the pdfplumber path uses
+        buf = io.StringIO()
+        for i, page_text in enumerate(page_texts, start=1):
+            buf.write(f"\n--- PAGE {i} ---\n\n")
+            buf.write(page_text)
+            buf.write("\n")
+
+        result = buf.getvalue()
+        log(f"   ✅ OCR completed: {len(result)} characters extracted")
         return result
     except Exception as e:
         print(f"   ❌ OCR Error: {e}")
         return ""
 
+def _fmt_row(row):
+    """One table row as ' | '-separated cells, no temp list per row.
+
+    pdfplumber cells are str or None almost always; the isinstance fast
+    path skips a str() call per cell.
+    """
+    return " | ".join(
+        "" if c is None else (c.strip() if isinstance(c, str) else str(c).strip())
+        for c in row)
+
+def _text_cache_path(pdf_path):
+    """Cache key from path + mtime + size — any rewrite invalidates it"""
+    try:
+        st = os.stat(pdf_path)
+    except OSError:
+        return None
+    key = hashlib.sha256(
+        f"{pdf_path}:{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()
+    return os.path.join(TEXT_CACHE_DIR, key)
+
 def extract_text_from_pdf(pdf_path):
-    if is_scanned_pdf(pdf_path):
-        print(f"   📸 Detected scanned PDF - using OCR")
+    # Re-runs over unchanged files skip pdfplumber/OCR entirely
+    cache_path = _text_cache_path(pdf_path)
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                return gzip.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Truncated/corrupt entry (EOFError, zlib.error, ...) — treat
+            # as a miss and overwrite it below
+            pass
+
+    text = _parse_pdf_text(pdf_path)
+
+    if cache_path is not None and text:
+        try:
+            os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+            # Write-then-rename so an interrupted run can't leave a
+            # truncated entry behind
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(text.encode('utf-8')))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # a failed cache write must never fail the extraction
+    return text
+
+def _ocr_single_page(pdf_path, page_no):
+    """Rasterize and OCR one page of an otherwise text-based PDF"""
+    from PIL import Image
+    try:
+        try:
+            import fitz
+        except ImportError:
+            fitz = None
+        if fitz is not None:
+            with fitz.open(pdf_path) as doc:
+                pix = doc[page_no - 1].get_pixmap(
+                    dpi=OCR_DPI, colorspace=fitz.csGRAY)
+                img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        else:
+            from pdf2image import convert_from_path
+            pages = convert_from_path(
+                pdf_path, dpi=OCR_DPI, first_page=page_no, last_page=page_no)
+            if not pages:
+                return ""
+            img = pages[0]
+        return _ocr_image(_prep_for_ocr(img, max_edge=None))
+    except Exception as e:
+        print(f"   ⚠️  Page {page_no} OCR failed: {e}")
+        return ""
+
+def _parse_pdf_text(pdf_path):
+    import pdfplumber
+
+    # Cheap PDFium probe first: scanned files go to OCR without ever
+    # paying for a pdfplumber open
+    scanned = _looks_scanned_fast(pdf_path)
+    if scanned:
+        log(f"   📸 Detected scanned PDF - using OCR")
         return extract_text_from_scanned_pdf(pdf_path)
-    
-    print(f"   📝 Detected text-based PDF - using pdfplumber")
-    full_text = []
-    
+
+    # One growable buffer instead of a list of thousands of small
+    # strings joined at the end
+    buf = io.StringIO()
+
+    # One open serves both the scanned check and the extraction — the old
+    # is_scanned_pdf parsed the whole document a second time just to look
+    # at page 1
     with pdfplumber.open(pdf_path) as pdf:
+        if scanned is None and _looks_scanned(pdf.pages[0]):
+            log(f"   📸 Detected scanned PDF - using OCR")
+            return extract_text_from_scanned_pdf(pdf_path)
+
+        log(f"   📝 Detected text-based PDF - using pdfplumber")
         for i, page in enumerate(pdf.pages, start=1):
-            full_text.append(f"\n--- PAGE {i} ---\n")
-            page_text = page.extract_text(x_tolerance=2, y_tolerance=3, layout=True)
+            buf.write(f"\n--- PAGE {i} ---\n\n")
+            # No layout=True: the positional reconstruction roughly doubles
+            # the per-page work and the AI doesn't need aligned columns
+            page_text = page.extract_text(x_tolerance=2, y_tolerance=3)
+            if not page_text or len(page_text) < 200:
+                # Oddball encodings sometimes only reconstruct with the
+                # layout engine — pay for it just on the pages that need it
+                layout_text = page.extract_text(
+                    x_tolerance=2, y_tolerance=3, layout=True)
+                if layout_text and len(layout_text) > len(page_text or ""):
+                    page_text = layout_text
+            if not page_text or len(page_text.strip()) < 50:
+                # Mixed PDF: a scanned page inside an otherwise text-based
+                # document — OCR just this page, not the whole file
+                log(f"   📸 Page {i} has no text layer - OCR for this page only")
+                ocr_text = _ocr_single_page(pdf_path, i)
+                if ocr_text:
+                    page_text = ocr_text
             if page_text:
-                full_text.append(page_text)
-            
-            tables = page.extract_tables()
-            if tables:
-                full_text.append("\n[TABLES ON THIS PAGE]")
-                for t_idx, table in enumerate(tables, start=1):
-                    full_text.append(f"\nTable {t_idx}:")
-                    for row in table:
-                        cleaned_row = [str(cell).strip() if cell else "" for cell in row]
-                        full_text.append(" | ".join(cleaned_row))
-    
-    return "\n".join(full_text)
+                buf.write(page_text)
+                buf.write("\n")
+
+            # Table detection re-parses the page's char stream — only pay
+            # for it when the flat text didn't surface the tax amounts
+            if not (page_text and _TAX_HINT_RE.search(page_text)):
+                tables = page.extract_tables()
+                if tables:
+                    buf.write("\n[TABLES ON THIS PAGE]\n")
+                    for t_idx, table in enumerate(tables, start=1):
+                        if not table:
+                            continue
+                        header = " ".join(
+                            str(c) if c else "" for c in table[0]).lower()
+                        if not _TABLE_KEEP_RE.search(header):
+                            continue
+                        buf.write(f"\nTable {t_idx}:\n")
+                        prev_row = None
+                        for row in table:
+                            # Continuation pages repeat the header row
+                            if row == prev_row:
+                                continue
+                            prev_row = row
+                            buf.write(_fmt_row(row))
+                            buf.write("\n")
+
+            # Release pdfplumber's per-page char/line caches
+            page.flush_cache()
+
+    return buf.getvalue()
 
 # ---------------------------
-# AI EXTRACTION (SIMPLE)
+# REGEX FALLBACKS
 # ---------------------------
-def extract_invoice_data_ai(text):
+# Every labeled field matched by one alternation against a pre-lowered
+# copy of the text — a single linear scan instead of one full-text pass
+# per field. Group spans index back into the original text when the
+# extracted value must keep its case. m.lastgroup identifies the branch.
+_FIELDS_RE = re.compile(
+    r'(?P<label>bill\s*to|buyer|consignee|ship\s*to)'
+    r'|(?P<g>[0-9]{2}[a-z]{5}[0-9]{4}[a-z][a-z0-9]z[a-z0-9])'
+    r'|\binv(?:oice)?\s*(?:no|number|#)\s*[:.\-]?\s*(?P<inv>[a-z0-9][a-z0-9/\-]*)'
+    r'|invoice\s*date\s*[:.\-]?\s*(?P<date1>[0-9]{1,2}[-/][a-z0-9]{1,9}[-/][0-9]{2,4})'
+    r'|\bdated?\s*[:.\-]?\s*(?P<date2>[0-9]{1,2}[-/][a-z0-9]{1,9}[-/][0-9]{2,4})'
+    r'|place\s*of\s*supply\s*[:\-]?\s*(?P<state>[a-z ]{3,30})'
+    r'|taxable\s*(?:value|amount)\s*[:\-]?\s*(?:₹|rs\.?|inr)?\s*(?P<taxable>[0-9][0-9,]*\.?\d*)'
+    r'|(?:grand\s*total|total\s*(?:amount|value))\s*[:\-]?\s*(?:₹|rs\.?|inr)?\s*(?P<total>[0-9][0-9,]*\.?\d*)'
+    r'|(?P<taxlbl>cgst|sgst|igst)(?P<taxline>[^\n]{0,80})')
+
+# Numbers on a tax line, with any trailing % captured so rates can be
+# dropped — "CGST @9% : 342.45" must yield the amount, not the rate
+_TAX_AMT_RE = re.compile(r'([0-9][0-9,]*\.?\d*)\s*(%)?')
+
+# Buyer names are matched on the original text — the uppercase lead-in
+# is part of the heuristic
+_BUYER_NAME_RE = re.compile(r'M/S\.?\s*[:\-]?\s*([A-Z][A-Za-z0-9 .&\-]{2,60})')
+
+def _scan_fields(text, text_lower):
     """
-    Send everything to AI and let it figure it out.
-    No regex, no complex rules, just AI doing its thing.
+    Collect every labeled field in one linear pass over the text.
+
+    The buyer GSTIN is the first GSTIN within 500 chars after a
+    buyer/consignee label; failing that, the second standalone GSTIN
+    (the first one on an invoice is usually the seller's). All other
+    fields keep the first occurrence.
     """
-    
-    prompt = f"""You are a GST invoice data extraction expert. Extract fields from this OCR text that contains errors.
+    found = {}
+    taxes = {}
+    last_label_end = None
+    gstin_spans = []
+    for m in _FIELDS_RE.finditer(text_lower):
+        kind = m.lastgroup
+        if kind == 'label':
+            last_label_end = m.end()
+        elif kind == 'g':
+            if ('Buyer_GSTIN' not in found and last_label_end is not None
+                    and m.start() - last_label_end <= 500):
+                found['Buyer_GSTIN'] = text[m.start():m.end()].upper()
+            else:
+                gstin_spans.append((m.start(), m.end()))
+        elif kind == 'inv':
+            found.setdefault('Invoice_no', text[m.start('inv'):m.end('inv')].strip())
+        elif kind in ('date1', 'date2'):
+            found.setdefault('Date', text[m.start(kind):m.end(kind)].strip())
+        elif kind == 'state':
+            found.setdefault('Buyer_State', text[m.start('state'):m.end('state')].strip())
+        elif kind == 'taxable':
+            found.setdefault('Taxable_Value', m.group('taxable'))
+        elif kind == 'total':
+            found.setdefault('Total_Value', m.group('total'))
+        elif kind == 'taxline':
+            # Last non-rate number on the line is the amount; rate-style
+            # lines put the percentage first
+            amounts = [n for n, pct in _TAX_AMT_RE.findall(m.group('taxline'))
+                       if not pct]
+            if amounts:
+                taxes.setdefault(m.group('taxlbl').upper(), amounts[-1])
+    if 'Buyer_GSTIN' not in found and len(gstin_spans) >= 2:
+        start, end = gstin_spans[1]
+        found['Buyer_GSTIN'] = text[start:end].upper()
+    return found, taxes
+
+def _try_pure_regex(text):
+    """
+    Deterministic extraction attempt — only trusted when every non-tax
+    field is found AND the tax rows form a coherent set. On success the
+    multi-second AI call is skipped entirely.
+    """
+    text_lower = text.lower()  # lowered once for the fused scan
+    data = dict.fromkeys(FIELDS)
+    found, taxes = _scan_fields(text, text_lower)
+    data.update(found)
+
+    m = _BUYER_NAME_RE.search(text)
+    data["Buyer_Name"] = m.group(1).strip() if m else None
+
+    # The tax label set must be unambiguous
+    if "IGST" in taxes and "CGST" not in taxes and "SGST" not in taxes:
+        data["IGST"] = taxes["IGST"]
+    elif "CGST" in taxes and "SGST" in taxes and "IGST" not in taxes:
+        data["CGST"] = taxes["CGST"]
+        data["SGST"] = taxes["SGST"]
+    else:
+        return None
+
+    required = (f for f in FIELDS if f not in ("CGST", "SGST", "IGST"))
+    if not all(data[f] for f in required):
+        return None
+
+    # Same arithmetic check the report runs: a mis-captured value (e.g. a
+    # rate instead of an amount) won't balance, so fall through to the AI
+    # rather than silently writing wrong numbers
+    expected = (_to_float(data["Taxable_Value"]) + _to_float(data["CGST"])
+                + _to_float(data["SGST"]) + _to_float(data["IGST"]))
+    if abs(expected - _to_float(data["Total_Value"])) >= 1.0:
+        return None
+    return data
+
+# ---------------------------
+# AI EXTRACTION (SIMPLE)
+# ---------------------------
+# Instruction block shared by the single and batched prompts — built once
+# so the batch path doesn't repeat it per invoice
+_PROMPT_INSTRUCTIONS = """You are a GST invoice data extraction expert. Extract fields from this OCR text that contains errors.
 
 CRITICAL: OCR ERRORS ARE PRESENT!
 - Lines may be garbled (e.g., "rata) 208 00] sao] 288920]" instead of "Total 2NOS 3,805.00 684.90 4,489.90")
@@ -190,7 +712,7 @@ FIELDS TO EXTRACT:
 
 Return ONLY JSON (no markdown):
 
-{{
+{
   "Invoice_no": "value",
   "Date": "value",
   "Buyer_Name": "value",
@@ -201,198 +723,435 @@ Return ONLY JSON (no markdown):
   "SGST": null,
   "IGST": "value with currency",
   "Total_Value": "value with currency"
-}}
+}"""
+
+# Textual nulls the AI sometimes emits instead of JSON null;
+# frozenset membership is one hashed lookup per field
+_NULLY = frozenset({"null", "none", "n/a", ""})
+
+def _normalize_nulls(data):
+    """Collapse the AI's textual nulls to real None values"""
+    for key in FIELDS:
+        val = data.get(key)
+        if isinstance(val, str) and val.strip().lower() in _NULLY:
+            data[key] = None
+    return data
 
-INVOICE TEXT:
-{text}"""
+def _fix_tax_exclusivity(data):
+    """Enforce IGST XOR (CGST+SGST) — never combine them"""
+    _normalize_nulls(data)
+    cgst_f = _to_float(data.get("CGST"))
+    sgst_f = _to_float(data.get("SGST"))
+    igst_f = _to_float(data.get("IGST"))
 
+    # If AI mistakenly extracted both types, fix it based on which is larger
+    # But NEVER calculate IGST from CGST+SGST or vice versa
+    if igst_f > 0 and (cgst_f > 0 or sgst_f > 0):
+        total_cgst_sgst = cgst_f + sgst_f
+        if igst_f > total_cgst_sgst:
+            print(f"   ⚠️  AI extracted both IGST and CGST/SGST - keeping IGST, removing others")
+            data["CGST"] = None
+            data["SGST"] = None
+        else:
+            print(f"   ⚠️  AI extracted both IGST and CGST/SGST - keeping CGST/SGST, removing IGST")
+            data["IGST"] = None
+    return data
+
+def _to_float(val):
+    """Convert to float for comparison (strip currency symbols)"""
+    if val is None:
+        return 0.0
     try:
-        print(f"\n   🤖 Sending to AI ({AI_MODEL})...")
-        
-        response = client.chat.completions.create(
-            model=AI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        
-        raw = response.choices[0].message.content.strip()
-        
-        # Show preview
-        print(f"\n   📝 AI Response Preview:")
-        preview = raw[:400] + "..." if len(raw) > 400 else raw
-        print(f"   {preview}\n")
-        
-        # Extract JSON
-        raw = re.sub(r'```json\s*', '', raw)
-        raw = re.sub(r'```\s*', '', raw)
-        
-        match = re.search(r"\{.*\}", raw, re.DOTALL)
-        if match:
-            data = json.loads(match.group())
-            
-            # Keep currency symbols in the data - don't clean them
-            # Just ensure numeric fields are present
-            
-            # Apply tax logic: IGST XOR (CGST+SGST) - never combine them
-            cgst = data.get("CGST")
-            sgst = data.get("SGST")
-            igst = data.get("IGST")
-            
-            # Convert to float for comparison (strip currency symbols)
-            def to_float(val):
-                if val is None:
-                    return 0.0
-                try:
-                    cleaned = re.sub(r'[₹$,\s]', '', str(val))
-                    cleaned = re.sub(r'(RS|SAR|USD|AED|INR|EUR|GBP)', '', cleaned, flags=re.IGNORECASE)
-                    return float(cleaned.strip())
-                except:
-                    return 0.0
-            
-            cgst_f = to_float(cgst)
-            sgst_f = to_float(sgst)
-            igst_f = to_float(igst)
-            
-            # If AI mistakenly extracted both types, fix it based on which is larger
-            # But NEVER calculate IGST from CGST+SGST or vice versa
-            if igst_f > 0 and (cgst_f > 0 or sgst_f > 0):
-                total_cgst_sgst = cgst_f + sgst_f
-                if igst_f > total_cgst_sgst:
-                    print(f"   ⚠️  AI extracted both IGST and CGST/SGST - keeping IGST, removing others")
-                    data["CGST"] = None
-                    data["SGST"] = None
-                else:
-                    print(f"   ⚠️  AI extracted both IGST and CGST/SGST - keeping CGST/SGST, removing IGST")
-                    data["IGST"] = None
-            
-            return data
+        cleaned = str(val).translate(_CURRENCY_STRIP).lower()
+        cleaned = _CURRENCY_CODE_RE.sub('', cleaned)
+        return float(cleaned)
+    except:
+        return 0.0
+
+async def _chat_with_retry(user_prompt, max_retries=4, max_tokens=600, history=()):
+    """Call the async Groq client, backing off exponentially on 429s.
+
+    The static instructions go in a system message, byte-stable across
+    calls, so the provider's prompt caching can reuse the tokenized
+    prefix; only the invoice text varies per request. `history` carries
+    feedback turns appended by the validate-and-retry callers.
+    """
+    delay = 1.0
+    for attempt in range(max_retries):
+        try:
+            response = await _get_client().chat.completions.create(
+                model=AI_MODEL,
+                messages=[
+                    {"role": "system", "content": _PROMPT_INSTRUCTIONS},
+                    {"role": "user", "content": user_prompt},
+                    *history,
+                ],
+                temperature=0,
+                max_tokens=max_tokens,
+                # JSON mode: the model must emit a parseable object, so the
+                # fence/JSON-hunting fallbacks become dead weight, not load
+                response_format={"type": "json_object"},
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429 and attempt < max_retries - 1:
+                print(f"   ⏳ Rate limited - retrying in {delay:.0f}s...")
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+            raise
+
+async def extract_invoice_data_ai(text):
+    """
+    Send everything to AI and let it figure it out.
+    No regex, no complex rules, just AI doing its thing.
+    """
+
+    try:
+        log(f"\n   🤖 Sending to AI ({AI_MODEL})...")
+
+        # A malformed answer used to drop the file; echoing the bad output
+        # back with the error recovers nearly all of them in 1-2 retries
+        history = []
+        for attempt in range(3):
+            raw = await _chat_with_retry(f"INVOICE TEXT:\n{text}",
+                                         history=history)
+
+            # Show preview
+            log(f"\n   📝 AI Response Preview:")
+            preview = raw[:400] + "..." if len(raw) > 400 else raw
+            log(f"   {preview}\n")
+
+            # Extract JSON
+            data = _extract_json(_FENCE_RE.sub('', raw))
+            if isinstance(data, dict):
+                # Keep currency symbols in the data - don't clean them
+                # Just ensure numeric fields are present
+                return _fix_tax_exclusivity(data)
+
+            print(f"   ⚠️  Attempt {attempt + 1}: response was not a JSON object - retrying with feedback")
+            history += [
+                {"role": "assistant", "content": raw},
+                {"role": "user", "content":
+                    "Your output was not a single valid JSON object."
+                    " Return ONLY the JSON object described above, nothing else."},
+            ]
+            await asyncio.sleep(1.0 * (attempt + 1))
+
+        print(f"   ❌ Could not find JSON in AI response")
+        return None
+
+    except Exception as e:
+        print(f"   ❌ AI Error: {e}")
+        return None
+
+# Keep each batched request comfortably inside the model context window
+_BATCH_CHAR_BUDGET = 40000
+# ...and cap the item count: max_tokens scales at 600 per invoice, and a
+# char-only budget would let dozens of tiny receipts push it past the
+# provider's completion-token limit (a deterministic 400 on every retry)
+_BATCH_MAX_ITEMS = 8
+
+def _chunk_for_batching(items):
+    """Group (filename, text) pairs under the char budget and item cap"""
+    batch, size = [], 0
+    for filename, text in items:
+        if batch and (len(batch) >= _BATCH_MAX_ITEMS
+                      or size + len(text) > _BATCH_CHAR_BUDGET):
+            yield batch
+            batch, size = [], 0
+        batch.append((filename, text))
+        size += len(text)
+    if batch:
+        yield batch
+
+async def extract_invoice_data_batch(items):
+    """
+    Extract several invoices with a single AI call.
+
+    Packs the invoices into one prompt and asks for {"results": [...]}
+    with one object per invoice, so the fixed instruction tokens and the
+    HTTP round trip are paid once per batch instead of once per file.
+    Returns {filename: data-or-None}.
+    """
+    if len(items) == 1:
+        filename, text = items[0]
+        return {filename: await extract_invoice_data_ai(text)}
+
+    sections = [
+        f"Invoice {idx} (id={filename}):\n{text}"
+        for idx, (filename, text) in enumerate(items, start=1)
+    ]
+    # The batch addendum rides in the user message so the system prefix
+    # stays byte-identical to the single-invoice path
+    prompt = (
+        'You are given SEVERAL invoices below, separated by "---" lines.'
+        ' Return ONLY JSON of the form {"results": [{...}, {...}]} with one'
+        ' object per invoice in the same shape as above, each with an extra'
+        ' "id" field copied from its header.'
+        "\n\nINVOICE TEXTS:\n" + "\n---\n".join(sections)
+    )
+
+    try:
+        log(f"\n   🤖 Sending batch of {len(items)} invoice(s) to AI ({AI_MODEL})...")
+
+        history = []
+        for attempt in range(3):
+            raw = await _chat_with_retry(
+                prompt, max_tokens=600 * len(items), history=history)
+            payload = _extract_json(_FENCE_RE.sub('', raw))
+            if isinstance(payload, dict) and isinstance(payload.get("results"), list):
+                break
+            print(f"   ⚠️  Attempt {attempt + 1}: batch response malformed - retrying with feedback")
+            history += [
+                {"role": "assistant", "content": raw},
+                {"role": "user", "content":
+                    'Your output was not valid. Return ONLY a JSON object of'
+                    ' the form {"results": [...]} with one object per invoice.'},
+            ]
+            await asyncio.sleep(1.0 * (attempt + 1))
         else:
             print(f"   ❌ Could not find JSON in AI response")
-            return None
-            
+            return {filename: None for filename, _ in items}
     except Exception as e:
         print(f"   ❌ AI Error: {e}")
+        return {filename: None for filename, _ in items}
+
+    results = {filename: None for filename, _ in items}
+    for entry in payload.get("results", []):
+        if isinstance(entry, dict):
+            key = str(entry.pop("id", "")).strip()
+            if key in results:
+                results[key] = _fix_tax_exclusivity(entry)
+    return results
+
+# ---------------------------
+# RESULT CACHE
+# ---------------------------
+def _cache_key_path(file_path):
+    """Cache file for this exact input + prompt + model combination"""
+    with open(file_path, 'rb') as f:
+        h = hashlib.sha256(f.read()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{h}_{PROMPT_VERSION}_{AI_MODEL}.json")
+
+def _cache_load(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            blob = f.read()
+        payload = orjson.loads(blob) if orjson is not None else json.loads(blob)
+        return payload["data"]
+    except (OSError, ValueError, KeyError):
         return None
 
+def _cache_store(cache_path, data):
+    payload = {
+        "data": data,
+        "model": AI_MODEL,
+        "prompt_version": PROMPT_VERSION,
+        "timestamp": time.time(),
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if orjson is not None:
+            blob = orjson.dumps(payload)
+        else:
+            blob = json.dumps(payload).encode('utf-8')
+        with open(cache_path, 'wb') as f:
+            f.write(blob)
+    except OSError:
+        pass  # a failed cache write must never fail the extraction
+
 # ---------------------------
 # MAIN LOOP
 # ---------------------------
+def _extract_text_worker(file_info):
+    """Extract text for one file (runs in a worker process)"""
+    filename, file_path, ext = file_info
+
+    log("\n" + "=" * 80)
+    log(f"📄 Processing: {filename}")
+    log("=" * 80)
+
+    if ext == '.pdf':
+        return filename, extract_text_from_pdf(file_path)
+    return filename, extract_text_from_image(file_path)
+
 def main():
-    rows = []
-    
     if not os.path.exists(PDF_FOLDER):
         print(f"❌ Folder '{PDF_FOLDER}' not found!")
         return
-    
-    all_files = os.listdir(PDF_FOLDER)
-    supported_files = [
-        f for f in all_files 
-        if f.lower().endswith('.pdf') or f.lower().endswith(IMAGE_EXTENSIONS)
-    ]
-    
+
+    # scandir skips the extra stat listdir-based filters tend to trigger;
+    # the extension is split and lowered exactly once per name and carried
+    # along so no later stage re-derives it
+    with os.scandir(PDF_FOLDER) as it:
+        supported_files = sorted(
+            (e.name, ext) for e in it
+            if e.is_file()
+            and (ext := os.path.splitext(e.name)[1].lower()) in _SUPPORTED_EXT_SET
+        )
+
     if not supported_files:
         print(f"❌ No supported files found in '{PDF_FOLDER}'")
         return
-    
+
     print(f"\n🔍 Found {len(supported_files)} file(s)\n")
-    
-    for filename in supported_files:
-        file_path = os.path.join(PDF_FOLDER, filename)
-        
-        print("\n" + "=" * 80)
-        print(f"📄 Processing: {filename}")
-        print("=" * 80)
-        
-        # Extract text
-        if filename.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(file_path)
-        elif filename.lower().endswith(IMAGE_EXTENSIONS):
-            text = extract_text_from_image(file_path)
-        else:
-            continue
-        
-        if not text or len(text.strip()) < 20:
-            print(f"⚠️  Very little text extracted")
-            continue
-        
-        # Let AI handle everything
-        data = extract_invoice_data_ai(text)
-        
-        if data:
-            data["File_Name"] = filename
-            rows.append(data)
-            
-            print("\n" + "=" * 80)
-            print("✅ EXTRACTED DATA:")
-            print("=" * 80)
-            for k in FIELDS:
-                val = data.get(k)
-                print(f"   {k:20s}: {val}")
-            
-            # Validation
-            print("\n" + "=" * 80)
-            print("🔍 VALIDATION:")
-            print("=" * 80)
-            
-            # Extract numeric values for validation (remove currency symbols temporarily)
-            def extract_number(val):
-                if val is None:
-                    return 0.0
-                try:
-                    # Remove currency symbols and commas for calculation
-                    cleaned = re.sub(r'[₹$,\s]', '', str(val))
-                    # Remove currency codes like RS, SAR, USD, AED
-                    cleaned = re.sub(r'(RS|SAR|USD|AED|INR|EUR|GBP)', '', cleaned, flags=re.IGNORECASE)
-                    return float(cleaned.strip())
-                except:
-                    return 0.0
-            
-            taxable = extract_number(data.get("Taxable_Value"))
-            cgst = extract_number(data.get("CGST"))
-            sgst = extract_number(data.get("SGST"))
-            igst = extract_number(data.get("IGST"))
-            total = extract_number(data.get("Total_Value"))
-            
-            expected = taxable + cgst + sgst + igst
-            
-            print(f"   Taxable Value: {data.get('Taxable_Value')}")
-            print(f"   + CGST:        {data.get('CGST')}")
-            print(f"   + SGST:        {data.get('SGST')}")
-            print(f"   + IGST:        {data.get('IGST')}")
-            print(f"   {'─' * 40}")
-            print(f"   = Expected:    {expected:,.2f}")
-            print(f"   Actual Total:  {data.get('Total_Value')}")
-            
-            diff = abs(expected - total)
-            if diff < 1.0:
-                print(f"\n   ✅ PASS: Math checks out! (diff: {diff:.2f})")
-            else:
-                print(f"\n   ⚠️  WARNING: Difference of {diff:,.2f}")
-                print(f"      This may be due to OCR errors or rounding")
-            
-            # Tax type
-            if igst > 0:
-                print(f"\n   📊 Tax Type: IGST (Inter-state)")
-            elif cgst > 0 or sgst > 0:
-                print(f"\n   📊 Tax Type: CGST/SGST (Intra-state)")
-            
-            print("=" * 80)
-        else:
-            print("\n❌ Extraction failed - check AI response above")
-    
-    # Save results
-    if rows:
-        with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["File_Name"] + FIELDS)
-            writer.writeheader()
-            writer.writerows(rows)
-        
+
+    # Resume support: rows already streamed to the CSV by an interrupted
+    # run are kept, and their files skipped outright
+    done_files = set()
+    if os.path.exists(OUTPUT_CSV):
+        try:
+            with open(OUTPUT_CSV, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                done_files = {row[0] for row in reader if row}
+        except OSError:
+            done_files = set()
+    if done_files:
+        print(f"♻️  Resuming: {len(done_files)} row(s) already in {OUTPUT_CSV}")
+        supported_files = [
+            (f, ext) for f, ext in supported_files if f not in done_files]
+        if not supported_files:
+            print(f"✅ Nothing left to do — every file is already in {OUTPUT_CSV}\n")
+            return
+
+    # Stream rows out as they complete: O(1) memory, and a crash midway
+    # loses nothing already written
+    saved = 0
+    mode = "a" if done_files else "w"
+    with open(OUTPUT_CSV, mode, newline="", encoding="utf-8") as csv_file:
+        # csv.writer takes the prebuilt tuple straight to C — DictWriter
+        # rebuilds a list via per-field dict lookups in Python first
+        writer = csv.writer(csv_file)
+        if mode == "w":
+            writer.writerow(["File_Name"] + FIELDS)
+
+        # Serve unchanged files straight from the cache — same bytes, same
+        # prompt, same model means the AI answer cannot differ
+        cache_paths = {}
+        file_infos = []
+        for filename, ext in supported_files:
+            file_path = os.path.join(PDF_FOLDER, filename)
+            cache_path = _cache_key_path(file_path)
+            cached = _cache_load(cache_path)
+            if cached is not None:
+                print(f"♻️  Cache hit: {filename}")
+                saved += _handle_result(filename, cached, writer, csv_file)
+                continue
+            cache_paths[filename] = cache_path
+            file_infos.append((filename, file_path, ext))
+
+        # Parse on all cores first: pdfplumber/OCR is CPU-bound, so separate
+        # processes dodge the GIL
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            extracted = list(pool.map(_extract_text_worker, file_infos))
+
+        items = []
+        for filename, text in extracted:
+            if not text or len(text.strip()) < 20:
+                print(f"⚠️  Very little text extracted from {filename}")
+                continue
+            # When the deterministic parsers recover every field there is
+            # nothing left for the AI to add
+            regex_data = _try_pure_regex(text)
+            if regex_data is not None:
+                print(f"⚡ Regex-only extraction (no AI call): {filename}")
+                _cache_store(cache_paths[filename], regex_data)
+                saved += _handle_result(filename, regex_data, writer, csv_file)
+                continue
+            # Regex ran over the full text; the AI only needs the
+            # label-bearing subset
+            items.append((filename, _compress_for_llm(text)))
+
+        # The AI calls are network-bound: one event loop multiplexes every
+        # batch on a single thread, with the semaphore capping how many
+        # requests are in flight at Groq at once
+        sem = asyncio.Semaphore(int(os.getenv("GROQ_CONCURRENCY", "16")))
+
+        async def _bounded(batch):
+            async with sem:
+                return batch, await extract_invoice_data_batch(batch)
+
+        async def _run_batches():
+            nonlocal saved
+            tasks = [asyncio.create_task(_bounded(batch))
+                     for batch in _chunk_for_batching(items)]
+            for task in asyncio.as_completed(tasks):
+                batch, results = await task
+                for filename, _ in batch:
+                    data = results.get(filename)
+                    if data:
+                        _cache_store(cache_paths[filename], data)
+                    saved += _handle_result(filename, data, writer, csv_file)
+
+        asyncio.run(_run_batches())
+
+    if saved:
         print(f"\n{'='*80}")
-        print(f"✅ SUCCESS: Extracted {len(rows)} invoice(s)")
+        print(f"✅ SUCCESS: Extracted {saved} invoice(s)")
         print(f"📁 Data saved to: {OUTPUT_CSV}")
         print(f"{'='*80}\n")
     else:
         print("\n⚠️  No data extracted from any files\n")
 
+def _handle_result(filename, data, writer, csv_file):
+    """Write one finished extraction to the CSV and print its report.
+
+    Returns 1 if a row was written, 0 otherwise.
+    """
+    if not data:
+        print("\n❌ Extraction failed - check AI response above")
+        return 0
+
+    with _csv_lock:
+        writer.writerow((filename, *(data.get(k, "") for k in FIELDS)))
+        csv_file.flush()
+
+    log("\n" + "=" * 80)
+    log("✅ EXTRACTED DATA:")
+    log("=" * 80)
+    for k in FIELDS:
+        val = data.get(k)
+        log(f"   {k:20s}: {val}")
+
+    # Validation
+    log("\n" + "=" * 80)
+    log("🔍 VALIDATION:")
+    log("=" * 80)
+
+    # Same currency stripping the tax-exclusivity fixer uses
+    taxable = _to_float(data.get("Taxable_Value"))
+    cgst = _to_float(data.get("CGST"))
+    sgst = _to_float(data.get("SGST"))
+    igst = _to_float(data.get("IGST"))
+    total = _to_float(data.get("Total_Value"))
+
+    expected = taxable + cgst + sgst + igst
+
+    log(f"   Taxable Value: {data.get('Taxable_Value')}")
+    log(f"   + CGST:        {data.get('CGST')}")
+    log(f"   + SGST:        {data.get('SGST')}")
+    log(f"   + IGST:        {data.get('IGST')}")
+    log(f"   {'─' * 40}")
+    log(f"   = Expected:    {expected:,.2f}")
+    log(f"   Actual Total:  {data.get('Total_Value')}")
+
+    diff = abs(expected - total)
+    if diff < 1.0:
+        log(f"\n   ✅ PASS: Math checks out! (diff: {diff:.2f})")
+    else:
+        log(f"\n   ⚠️  WARNING: Difference of {diff:,.2f}")
+        log(f"      This may be due to OCR errors or rounding")
+
+    # Tax type
+    if igst > 0:
+        log(f"\n   📊 Tax Type: IGST (Inter-state)")
+    elif cgst > 0 or sgst > 0:
+        log(f"\n   📊 Tax Type: CGST/SGST (Intra-state)")
+
+    log("=" * 80)
+    return 1
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()